@@ -1,57 +1,122 @@
-from flask import Flask, request, render_template_string, jsonify, send_file
+from flask import Flask, request, send_file, Response, stream_with_context
 from twilio.twiml.messaging_response import MessagingResponse
+from twilio.rest import Client
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import io
+import json
+import logging
 import requests
 import os
 from parser import extract_text_from_pdf, extract_details_huggingface
-from csv_storage import (
-    save_to_csv,
-    get_all_resumes,
+from db import (
+    save_resume,
+    count_resumes,
+    get_stats,
+    iter_resumes,
     update_status,
-    search_by_cgpa,
     export_to_excel
 )
-import mimetypes
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 load_dotenv()
 
-TWILIO_SID = os.getenv("TWILIO_SID")
-TWILIO_TOKEN = os.getenv("TWILIO_TOKEN")
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s %(levelname)s %(message)s"
+)
+logger = logging.getLogger("resume")
 
 
-def download_media(media_url, file_path):
-    """Download media file from Twilio"""
+def ojson(payload, status=200):
+    """jsonify replacement: orjson is ~3-5x faster at encoding dicts/lists"""
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload)
+    return Response(body, status=status, mimetype="application/json")
+
+
+if orjson is not None:
+    def _json_row(row):
+        return orjson.dumps(row).decode("utf-8")
+else:
+    def _json_row(row):
+        return json.dumps(row)
+
+TWILIO_SID = os.getenv("TWILIO_SID")
+TWILIO_TOKEN = os.getenv("TWILIO_TOKEN")
+TWILIO_WHATSAPP_FROM = os.getenv("TWILIO_WHATSAPP_FROM")  # e.g. "whatsapp:+14155238886"
+
+# Bounded worker pool so the webhook can ack Twilio immediately and the
+# heavy download/parse/save work runs in the background
+EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("WORKERS", "8")))
+
+twilio_client = Client(TWILIO_SID, TWILIO_TOKEN) if TWILIO_SID and TWILIO_TOKEN else None
+
+# Shared session so repeated Twilio downloads reuse one TCP+TLS connection
+# instead of paying the handshake on every message
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=50,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=[429, 500, 502, 503, 504]
+    )
+))
+
+
+def download_media(media_url):
+    """Download media from Twilio into memory and return the raw bytes"""
     try:
-        response = requests.get(
+        response = SESSION.get(
             media_url,
             auth=HTTPBasicAuth(TWILIO_SID, TWILIO_TOKEN),
-            timeout=30
+            timeout=30,
+            stream=True
         )
         response.raise_for_status()
 
-        with open(file_path, "wb") as f:
-            f.write(response.content)
+        data = b"".join(response.iter_content(64 * 1024))
 
-        print(f"✅ Downloaded media to {file_path}")
-        return response.status_code
-    except Exception as e:
-        print(f"❌ Error downloading media: {e}")
+        logger.debug("Downloaded %d bytes of media", len(data))
+        return data
+    except Exception:
+        logger.exception("Error downloading media")
         raise
 
 
-def is_pdf(file_path):
-    """Check if file is a PDF"""
-    mime_type, _ = mimetypes.guess_type(file_path)
-    return mime_type == "application/pdf"
+def is_pdf(buf):
+    """Check for the %PDF- magic bytes (filenames and mime types can lie)"""
+    return buf[:5] == b"%PDF-"
 
 
 app = Flask(__name__)
 
+# Gzip JSON responses; the resume list is text-heavy and compresses 5-10x
+if Compress is not None:
+    app.config["COMPRESS_MIMETYPES"] = ["application/json"]
+    app.config["COMPRESS_LEVEL"] = 6
+    Compress(app)
 
-@app.route("/", methods=["GET"])
-def home():
-    return """
+# The home and admin pages contain no template variables, so they are
+# encoded once at import time and served as static bytes with an ETag
+HOME_HTML = """
     <html>
     <head>
         <title>Resume Parser Service</title>
@@ -88,39 +153,71 @@ def home():
     </html>
     """
 
+HOME_HTML_BYTES = HOME_HTML.encode("utf-8")
+HOME_ETAG = hashlib.md5(HOME_HTML_BYTES).hexdigest()
 
-@app.route("/whatsapp", methods=["POST"])
-def whatsapp_webhook():
-    """Handle incoming WhatsApp messages (PDF or text)"""
-    msg = request.values.get("Body", "").strip()
-    media_url = request.values.get("MediaUrl0", None)
-    sender = request.values.get("From", "").replace("whatsapp:", "")
 
-    resp = MessagingResponse()
+def _static_html_response(body, etag):
+    """Serve a precomputed HTML page, answering 304 to a matching ETag"""
+    if request.headers.get("If-None-Match") == etag:
+        return "", 304
+
+    return Response(body, mimetype="text/html", headers={
+        "ETag": etag,
+        "Cache-Control": "public, max-age=3600"
+    })
+
+
+@app.route("/", methods=["GET"])
+def home():
+    return _static_html_response(HOME_HTML_BYTES, HOME_ETAG)
+
+
+def _notify_sender(sender, body):
+    """Send a follow-up WhatsApp message via the Twilio REST API"""
+    if not twilio_client or not TWILIO_WHATSAPP_FROM:
+        logger.warning("Twilio REST client not configured, skipping notification: %s", body)
+        return
 
     try:
-        os.makedirs("resumes", exist_ok=True)
+        twilio_client.messages.create(
+            from_=TWILIO_WHATSAPP_FROM,
+            to=f"whatsapp:{sender}",
+            body=body
+        )
+    except Exception:
+        logger.exception("Error sending WhatsApp notification")
+
+
+def _process_resume(sender, media_url, msg):
+    """Download, parse and save a resume, then message the sender the result"""
+    try:
         text = ""
 
         # 1️⃣ If PDF is sent
         if media_url:
-            safe_sender = sender.replace("+", "").replace(":", "")
-            file_path = os.path.join("resumes", f"resume_{safe_sender}.pdf")
+            buf = download_media(media_url)
 
-            download_media(media_url, file_path)
+            if not is_pdf(buf):
+                _notify_sender(sender, "⚠️ Please send a PDF file only.")
+                return
 
-            if not is_pdf(file_path):
-                os.remove(file_path)
-                resp.message("⚠️ Please send a PDF file only.")
-                return str(resp)
+            # Keep a copy on disk only when explicitly requested
+            if os.getenv("SAVE_PDFS") == "1":
+                safe_sender = sender.replace("+", "").replace(":", "")
+                os.makedirs("resumes", exist_ok=True)
+                with open(os.path.join("resumes", f"resume_{safe_sender}.pdf"), "wb") as f:
+                    f.write(buf)
 
-            text = extract_text_from_pdf(file_path)
+            # Parse straight from memory, no disk round trip
+            text = extract_text_from_pdf(io.BytesIO(buf))
 
             if not text or len(text.strip()) < 20:
-                resp.message(
+                _notify_sender(
+                    sender,
                     "⚠️ Could not extract text from PDF. Ensure it's not image-based or password-protected."
                 )
-                return str(resp)
+                return
 
         # 2️⃣ If plain text is sent (no PDF)
         elif msg:
@@ -128,47 +225,53 @@ def whatsapp_webhook():
 
         # 3️⃣ If neither, ask for input
         else:
-            resp.message("📄 Please send your resume as a PDF or paste it as plain text.")
-            return str(resp)
+            _notify_sender(sender, "📄 Please send your resume as a PDF or paste it as plain text.")
+            return
 
         # Extract details
-        print("🤖 Extracting candidate details...")
+        logger.debug("Extracting candidate details...")
         details = extract_details_huggingface(text, sender)
 
-        print(f"✅ Extracted details: {details}")
+        logger.debug("Extracted details: %s", details)
 
-        # Save to CSV
-        saved = save_to_csv(details)
+        # Save to the database
+        saved = save_resume(details)
         if not saved:
-            resp.message("⚠️ This email has already been submitted!")
-            return str(resp)
+            _notify_sender(sender, "⚠️ This email has already been submitted!")
+            return
 
-        resp.message("✅ Resume processed successfully!")
+        _notify_sender(sender, "✅ Resume processed successfully!")
 
     except Exception as e:
-        print(f"❌ Error processing resume/text: {e}")
-        import traceback
-        traceback.print_exc()
-        resp.message(f"❌ Error: {str(e)}. Please try again.")
+        logger.exception("Error processing resume/text")
+        _notify_sender(sender, f"❌ Error: {str(e)}. Please try again.")
+
+
+@app.route("/whatsapp", methods=["POST"])
+def whatsapp_webhook():
+    """Handle incoming WhatsApp messages (PDF or text)"""
+    msg = request.values.get("Body", "").strip()
+    media_url = request.values.get("MediaUrl0", None)
+    sender = request.values.get("From", "").replace("whatsapp:", "")
 
-    return str(resp)
+    # Ack Twilio immediately; the result is delivered as a follow-up message
+    EXECUTOR.submit(_process_resume, sender, media_url, msg)
+
+    return str(MessagingResponse())
 
 @app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    return ojson({
         "status": "healthy",
         "service": "resume-parser",
-        "resumes_count": len(get_all_resumes())
+        "resumes_count": count_resumes()
     }), 200
 
 
 # ==================== ADMIN DASHBOARD ROUTES ====================
 
-@app.route("/admin", methods=["GET"])
-def admin_dashboard():
-    """Admin dashboard to view all resumes"""
-    html = """
+ADMIN_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -373,12 +476,12 @@ def admin_dashboard():
                 <label>Filter by CGPA ≥</label>
                 <input type="number" id="cgpa-filter" placeholder="8.0" step="0.1" min="0" max="10">
                 <button onclick="filterByCGPA()">Apply Filter</button>
-                <button onclick="loadResumes()">Clear Filter</button>
-                
+                <button onclick="clearFilter()">Clear Filter</button>
+
                 <button onclick="exportExcel()" class="btn-success ml-auto">
                     📊 Download Excel
                 </button>
-                <button onclick="loadResumes()">🔄 Refresh</button>
+                <button onclick="loadResumes(currentOffset)">🔄 Refresh</button>
             </div>
 
             <div class="table-container">
@@ -400,23 +503,50 @@ def admin_dashboard():
                     </tbody>
                 </table>
             </div>
+
+            <div class="filter-section" style="margin-top: 20px; justify-content: center;">
+                <button id="prev-page" onclick="prevPage()">◀ Prev</button>
+                <span id="page-info" style="color: #666;">Loading...</span>
+                <button id="next-page" onclick="nextPage()">Next ▶</button>
+            </div>
         </div>
 
         <script>
-            function loadResumes() {
-                fetch('/api/resumes')
+            // Fetch one page at a time so the DOM never holds the full table
+            const PAGE_SIZE = 100;
+            let currentOffset = 0;
+            let currentMinCGPA = null;
+
+            function loadResumes(offset = 0) {
+                currentOffset = Math.max(0, offset);
+                const params = new URLSearchParams({limit: PAGE_SIZE, offset: currentOffset});
+                if (currentMinCGPA !== null) params.set('min_cgpa', currentMinCGPA);
+
+                fetch('/api/resumes?' + params)
                     .then(r => r.json())
                     .then(data => {
                         displayResumes(data.resumes);
-                        updateStats(data.resumes);
+                        updateStats(data.stats || {});
+                        updatePagination(data);
                     })
                     .catch(err => {
                         console.error('Error loading resumes:', err);
-                        document.getElementById('resume-tbody').innerHTML = 
+                        document.getElementById('resume-tbody').innerHTML =
                             '<tr><td colspan="9" style="text-align: center; color: red;">Error loading resumes</td></tr>';
                     });
             }
 
+            function updatePagination(data) {
+                document.getElementById('page-info').textContent = data.total === 0
+                    ? 'No resumes'
+                    : `${data.offset + 1}–${data.offset + data.count} of ${data.total}`;
+                document.getElementById('prev-page').disabled = data.offset === 0;
+                document.getElementById('next-page').disabled = data.offset + data.count >= data.total;
+            }
+
+            function prevPage() { loadResumes(currentOffset - PAGE_SIZE); }
+            function nextPage() { loadResumes(currentOffset + PAGE_SIZE); }
+
             function displayResumes(resumes) {
                 const tbody = document.getElementById('resume-tbody');
                 
@@ -447,21 +577,11 @@ def admin_dashboard():
                 `).join('');
             }
 
-            function updateStats(resumes) {
-                document.getElementById('total-resumes').textContent = resumes.length;
-                
-                const pending = resumes.filter(r => (r.Status || 'Pending') === 'Pending').length;
-                document.getElementById('pending-count').textContent = pending;
-
-                const cgpas = resumes
-                    .map(r => parseFloat((r.CGPA || '0').split('/')[0]))
-                    .filter(c => !isNaN(c) && c > 0);
-                
-                const avgCGPA = cgpas.length > 0 
-                    ? (cgpas.reduce((a, b) => a + b, 0) / cgpas.length).toFixed(2)
-                    : '0.0';
-                
-                document.getElementById('avg-cgpa').textContent = avgCGPA;
+            // Stats are aggregated server-side in a single SQL pass
+            function updateStats(stats) {
+                document.getElementById('total-resumes').textContent = stats.total || 0;
+                document.getElementById('pending-count').textContent = stats.pending || 0;
+                document.getElementById('avg-cgpa').textContent = (stats.avg_cgpa || 0).toFixed(2);
             }
 
             function updateStatus(email, status) {
@@ -475,7 +595,7 @@ def admin_dashboard():
                 .then(r => r.json())
                 .then(data => {
                     if (data.success) {
-                        loadResumes();
+                        loadResumes(currentOffset);
                     } else {
                         alert('Failed to update status');
                     }
@@ -492,17 +612,15 @@ def admin_dashboard():
                     alert('Please enter a CGPA value');
                     return;
                 }
-                
-                fetch(`/api/resumes?min_cgpa=${minCGPA}`)
-                    .then(r => r.json())
-                    .then(data => {
-                        displayResumes(data.resumes);
-                        updateStats(data.resumes);
-                    })
-                    .catch(err => {
-                        console.error('Error filtering resumes:', err);
-                        alert('Error filtering resumes');
-                    });
+
+                currentMinCGPA = minCGPA;
+                loadResumes(0);
+            }
+
+            function clearFilter() {
+                currentMinCGPA = null;
+                document.getElementById('cgpa-filter').value = '';
+                loadResumes(0);
             }
 
             function exportExcel() {
@@ -518,29 +636,67 @@ def admin_dashboard():
             loadResumes();
             
             // Auto-refresh every 30 seconds
-            setInterval(loadResumes, 30000);
+            setInterval(() => loadResumes(currentOffset), 30000);
         </script>
     </body>
     </html>
     """
-    return render_template_string(html)
 
+ADMIN_HTML_BYTES = ADMIN_HTML.encode("utf-8")
+ADMIN_ETAG = hashlib.md5(ADMIN_HTML_BYTES).hexdigest()
 
-@app.route("/api/resumes", methods=["GET"])
-def api_get_resumes():
-    """API endpoint to get all resumes or filter by CGPA"""
-    try:
-        min_cgpa = request.args.get('min_cgpa', type=float)
 
-        if min_cgpa:
-            resumes = search_by_cgpa(min_cgpa)
-        else:
-            resumes = get_all_resumes()
+@app.route("/admin", methods=["GET"])
+def admin_dashboard():
+    """Admin dashboard to view all resumes"""
+    return _static_html_response(ADMIN_HTML_BYTES, ADMIN_ETAG)
 
-        return jsonify({"success": True, "resumes": resumes, "count": len(resumes)})
-    except Exception as e:
-        print(f"❌ Error in api_get_resumes: {e}")
-        return jsonify({"success": False, "error": str(e), "resumes": []})
+
+@app.route("/api/resumes", methods=["GET"])
+def api_get_resumes():
+    """API endpoint to get all resumes or filter by CGPA, streamed as JSON"""
+    min_cgpa = request.args.get('min_cgpa', type=float)
+    limit = request.args.get('limit', 100, type=int)
+    offset = request.args.get('offset', 0, type=int)
+
+    def generate():
+        # Run the queries before the first byte goes out so a DB failure
+        # still surfaces as success: false instead of an empty dashboard
+        try:
+            rows = iter_resumes(min_cgpa, limit, offset)
+            first = next(rows, None)
+            total = count_resumes(min_cgpa)
+            stats = get_stats()
+        except Exception as e:
+            logger.exception("Error in api_get_resumes")
+            yield _json_row({"success": False, "error": str(e)})
+            return
+
+        # Stream the remaining rows as they are read so peak memory
+        # stays O(1) in the row count
+        yield '{"success": true, "resumes": ['
+        count = 0
+        error = None
+        try:
+            if first is not None:
+                yield _json_row(first)
+                count = 1
+            for row in rows:
+                yield "," + _json_row(row)
+                count += 1
+        except Exception as e:
+            # The envelope is already open; flag the failure in the tail
+            # so the client can tell a truncated list from an empty one
+            logger.exception("Error in api_get_resumes")
+            error = str(e)
+        yield (f'], "count": {count}, "total": {total},'
+               f' "limit": {limit}, "offset": {offset},'
+               f' "stats": {_json_row(stats)}')
+        if error is not None:
+            yield f', "error": {_json_row(error)}'
+        yield '}'
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
 
 
 @app.route("/api/update-status", methods=["POST"])
@@ -552,13 +708,13 @@ def api_update_status():
         status = data.get("status")
 
         if not email or not status:
-            return jsonify({"success": False, "error": "Missing email or status"})
+            return ojson({"success": False, "error": "Missing email or status"})
 
         success = update_status(email, status)
-        return jsonify({"success": success})
+        return ojson({"success": success})
     except Exception as e:
-        print(f"❌ Error in api_update_status: {e}")
-        return jsonify({"success": False, "error": str(e)})
+        logger.exception("Error in api_update_status")
+        return ojson({"success": False, "error": str(e)})
 
 
 @app.route("/api/export-excel", methods=["GET"])
@@ -570,10 +726,10 @@ def api_export_excel():
         excel_path = f"resumes_export_{timestamp}.xlsx"
 
         # Generate Excel file
-        success = export_to_excel("resumes.csv", excel_path)
+        success = export_to_excel(excel_path)
 
         if not success:
-            return jsonify({
+            return ojson({
                 "success": False,
                 "error": "Failed to create Excel file. Make sure openpyxl is installed: pip install openpyxl"
             })
@@ -597,8 +753,8 @@ def api_export_excel():
         return response
 
     except Exception as e:
-        print(f"❌ Error exporting Excel: {e}")
-        return jsonify({"success": False, "error": str(e)})
+        logger.exception("Error exporting Excel")
+        return ojson({"success": False, "error": str(e)})
 
 
 if __name__ == "__main__":
@@ -608,9 +764,14 @@ if __name__ == "__main__":
     print("🚀 Flask WhatsApp Resume Parser Starting...")
     print("=" * 60)
     print(f"📁 Resumes folder: ./resumes/")
-    print(f"📊 CSV output: ./resumes.csv")
+    print(f"📊 Database: ./resumes.db")
     print(f"🌐 Admin Dashboard: http://localhost:5000/admin")
     print(f"🏥 Health Check: http://localhost:5000/health")
     print("=" * 60)
 
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    if os.getenv("FLASK_DEV") == "1":
+        # Werkzeug dev server: single process, reloader, debug pages
+        app.run(host="0.0.0.0", port=5000, debug=True)
+    else:
+        print("Run with: gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5000 wsgi:app")
+        print("(or set FLASK_DEV=1 for the development server)")
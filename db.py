@@ -0,0 +1,241 @@
+import os
+import sqlite3
+import threading
+
+from csv_storage import parse_cgpa
+
+DB_PATH = os.getenv("RESUMES_DB", "resumes.db")
+LEGACY_CSV = "resumes.csv"
+
+_SELECT_COLS = "name, email, phone, college, degree, cgpa, status"
+
+_CONN = None
+_CONN_LOCK = threading.Lock()
+
+
+def _connect():
+    """Open (once) the WAL-mode database, creating the schema if needed"""
+    global _CONN
+
+    with _CONN_LOCK:
+        if _CONN is None:
+            conn = sqlite3.connect(
+                DB_PATH, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS resumes (
+                    email TEXT PRIMARY KEY COLLATE NOCASE,
+                    name TEXT,
+                    phone TEXT,
+                    college TEXT,
+                    degree TEXT,
+                    cgpa TEXT,
+                    cgpa_num REAL,
+                    status TEXT DEFAULT 'Pending',
+                    created_at INTEGER DEFAULT (strftime('%s', 'now'))
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cgpa ON resumes(cgpa_num)")
+            _import_legacy_csv(conn)
+            _CONN = conn
+
+    return _CONN
+
+
+def _parse_cgpa_num(cgpa):
+    """Numeric CGPA for the indexed column, NULL when there is none"""
+    return parse_cgpa(cgpa) or None
+
+
+def _row_to_dict(row):
+    # Same keys the CSV layer used, so the dashboard JS keeps working
+    return {
+        "Name": row["name"],
+        "Email": row["email"],
+        "Phone": row["phone"],
+        "College": row["college"],
+        "Degree": row["degree"],
+        "CGPA": row["cgpa"],
+        "Status": row["status"],
+    }
+
+
+def _import_legacy_csv(conn):
+    """One-time import of a pre-existing resumes.csv into the database"""
+    if conn.execute("SELECT 1 FROM resumes LIMIT 1").fetchone():
+        return
+
+    if not os.path.isfile(LEGACY_CSV):
+        return
+
+    from csv_storage import get_all_resumes as read_csv_rows
+
+    rows = read_csv_rows(LEGACY_CSV)
+    if not rows:
+        return
+
+    print(f"📦 Importing {len(rows)} resumes from {LEGACY_CSV}")
+    for row in rows:
+        cgpa = row.get("CGPA")
+        conn.execute(
+            """INSERT OR IGNORE INTO resumes
+               (email, name, phone, college, degree, cgpa, cgpa_num, status)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (row.get("Email"), row.get("Name"), row.get("Phone"),
+             row.get("College"), row.get("Degree"), cgpa,
+             _parse_cgpa_num(cgpa), row.get("Status") or "Pending")
+        )
+
+
+def save_resume(details):
+    """Save resume details; returns False if the email was already submitted"""
+    cgpa = details.get("cgpa", "N/A")
+
+    cur = _connect().execute(
+        """INSERT OR IGNORE INTO resumes
+           (email, name, phone, college, degree, cgpa, cgpa_num)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (details.get("email"), details.get("name", "N/A"),
+         details.get("phone", "N/A"), details.get("college", "N/A"),
+         details.get("degree", "N/A"), cgpa, _parse_cgpa_num(cgpa))
+    )
+
+    if cur.rowcount == 0:
+        print(f"⚠️ Duplicate email found: {details.get('email')}")
+        return False
+
+    print(f"✅ Saved to {DB_PATH}")
+    return True
+
+
+def iter_resumes(min_cgpa=None, limit=None, offset=0):
+    """Yield resume rows one at a time for streaming responses"""
+    conn = _connect()
+    params = []
+
+    sql = f"SELECT {_SELECT_COLS} FROM resumes"
+    if min_cgpa is not None:
+        sql += " WHERE cgpa_num >= ? ORDER BY cgpa_num DESC"
+        params.append(min_cgpa)
+    else:
+        sql += " ORDER BY created_at, email"
+
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+
+    for row in conn.execute(sql, params):
+        yield _row_to_dict(row)
+
+
+def get_all_resumes():
+    """Read all resumes from the database"""
+    return list(iter_resumes())
+
+
+def search_by_cgpa(min_cgpa):
+    """Find candidates with CGPA >= min_cgpa via the cgpa_num index"""
+    return list(iter_resumes(min_cgpa))
+
+
+def count_resumes(min_cgpa=None):
+    """Number of stored resumes (cheap COUNT, no row materialization)"""
+    conn = _connect()
+    if min_cgpa is not None:
+        return conn.execute(
+            "SELECT COUNT(*) FROM resumes WHERE cgpa_num >= ?",
+            (min_cgpa,)).fetchone()[0]
+    return conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+
+def get_stats():
+    """Dashboard aggregates (total / pending / average CGPA) in one scan"""
+    row = _connect().execute(
+        """SELECT COUNT(*),
+                  COUNT(*) FILTER (WHERE status = 'Pending'),
+                  ROUND(AVG(cgpa_num), 2)
+           FROM resumes"""
+    ).fetchone()
+    return {"total": row[0], "pending": row[1], "avg_cgpa": row[2] or 0.0}
+
+
+def update_status(email, new_status):
+    """Update the status of a resume by email"""
+    cur = _connect().execute(
+        "UPDATE resumes SET status = ? WHERE email = ?", (new_status, email))
+
+    if cur.rowcount == 0:
+        return False
+
+    print(f"✅ Updated status for {email} to {new_status}")
+    return True
+
+
+def export_to_excel(output_path="resumes.xlsx"):
+    """Export all resumes to a formatted Excel file"""
+    conn = _connect()
+
+    if not conn.execute("SELECT 1 FROM resumes LIMIT 1").fetchone():
+        print("⚠️ No resumes to export")
+        return False
+
+    try:
+        import xlsxwriter
+    except ImportError:
+        # Fall back to the openpyxl streaming exporter
+        from csv_storage import export_rows_to_excel
+        return export_rows_to_excel(get_all_resumes(), output_path)
+
+    try:
+        headers = ["Name", "Email", "Phone", "College", "Degree", "CGPA", "Status"]
+
+        # constant_memory keeps only the current row in RAM
+        wb = xlsxwriter.Workbook(output_path, {"constant_memory": True})
+        ws = wb.add_worksheet("Resumes")
+
+        header_fmt = wb.add_format({
+            "bold": True, "font_color": "#FFFFFF", "bg_color": "#4472C4",
+            "border": 1, "align": "center", "valign": "vcenter", "font_size": 12
+        })
+        cell_fmt = wb.add_format({"border": 1, "valign": "vcenter"})
+
+        ws.write_row(0, 0, headers, header_fmt)
+        ws.freeze_panes(1, 0)
+
+        widths = [len(h) for h in headers]
+        row_num = 0
+        for row in iter_resumes():
+            row_num += 1
+            values = [row.get(h) if row.get(h) is not None else "N/A" for h in headers]
+            ws.write_row(row_num, 0, values, cell_fmt)
+            widths = [max(w, len(str(v))) for w, v in zip(widths, values)]
+
+        for col_num, width in enumerate(widths):
+            ws.set_column(col_num, col_num, min(width + 2, 50))
+
+        # Status colors via conditional formats instead of per-cell styling
+        status_col = headers.index("Status")
+        for status, font_color, bg_color in [
+            ("Reviewed", "#006100", "#C6EFCE"),
+            ("Shortlisted", "#9C6500", "#FFEB9C"),
+            ("Rejected", "#9C0006", "#FFC7CE"),
+        ]:
+            ws.conditional_format(1, status_col, row_num, status_col, {
+                "type": "cell",
+                "criteria": "==",
+                "value": f'"{status}"',
+                "format": wb.add_format({
+                    "bg_color": bg_color,
+                    "font_color": font_color,
+                    "bold": True
+                })
+            })
+
+        wb.close()
+        print(f"✅ Exported to {output_path}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error exporting to Excel: {e}")
+        return False
@@ -1,16 +1,170 @@
+import os
+
 import pdfplumber
 import re
-from transformers import pipeline
+
+# pdfium extracts plain text 5-20x faster than pdfplumber because it
+# skips the per-character layout table; pdfplumber stays as fallback
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Every pattern is compiled once at import so the hot path never goes
+# through re's internal cache lookup
+_WS_RE = re.compile(r'\s+')
+
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+
+# Fused contact pattern: one walk over the text finds email, phone and
+# the labelled CGPA form together instead of seven separate searches
+_CONTACT_RE = re.compile(
+    r'(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)'
+    r'|(?P<phone>\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}|\+?\d{10,15}\b)'
+    r'|(?:CGPA|GPA|Grade)\s*[:\-]?\s*(?P<cgpa>\d+\.?\d*)(?:\s*(?:/|out\s+of)\s*(?P<cgpa_max>\d+\.?\d*))?',
+    re.IGNORECASE)
+_PHONE_CLEAN_RE = re.compile(r'[-.\s()]')
+
+# clean_name cleanups
+_NAME_SPECIAL_RE = re.compile(r'[#\*\-\_\|]+')
+_NAME_PREFIX_RE = re.compile(r'^(Mr\.?|Ms\.?|Mrs\.?|Dr\.?|Prof\.?)\s+', re.IGNORECASE)
+_NAME_SUFFIX_RE = re.compile(r'\s+(Resume|CV|Profile)', re.IGNORECASE)
+_NAME_DIGIT_RE = re.compile(r'\d+')
+
+# Fallback name pattern: 2-4 capitalized words at the start of a line
+_NAME_LINE_RE = re.compile(r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})', re.MULTILINE)
+
+# Header lines that can't be a candidate name
+_NAME_SKIP_RE = re.compile(
+    r'resume|cv|curriculum|profile|contact|email|phone|education|experience',
+    re.IGNORECASE)
+
+_COLLEGE_RES = [
+    # Pattern 1: Capture full name before year (most reliable)
+    re.compile(r'([A-Z][A-Za-z\s&,.-]+?(?:Institute|University|College|School)[A-Za-z\s&,.-]*?)\s*\d{4}', re.IGNORECASE),
+    # Pattern 2: Capture institute with "of" prefix
+    re.compile(r'([A-Z][^\n]*?\s+(?:Institute|University|College|School)\s+of\s+[^\n]+?)(?:\d{4}|\n)', re.IGNORECASE),
+    # Pattern 3: Famous institutes with abbreviations
+    re.compile(r'((?:IIT|NIT|BITS|VIT|MIT|IIM|IIIT)[^\n]+?)(?:\d{4}|\n)', re.IGNORECASE),
+    # Pattern 4: Generic institute names
+    re.compile(r'([A-Z][^\n]{10,80}?(?:Institute|University|College|School)[^\n]{0,40}?)(?:\d{4}|\n)', re.IGNORECASE),
+    # Pattern 5: Fallback
+    re.compile(r'\b(IIT|NIT|BITS|VIT|MIT|IIM|IIIT)\s+[A-Z][a-zA-Z]*', re.IGNORECASE)
+]
+# One alternation strips year ranges ("2020-2024" / "2022-Present") and a
+# leading "Education" header in a single pass over the match
+_COLLEGE_CLEAN_RE = re.compile(r'\d{4}\s*[-–]\s*(?:\d{4}|Present)|^\s*Education\s*', re.IGNORECASE)
+
+# Aho-Corasick automaton over the institute anchor words: one O(n) scan
+# finds every anchor, and the backtracking college patterns then run only
+# on a small window around each hit instead of the whole text head.
+# Terms are lowercase; _extract_college scans a lowercased copy so the
+# anchoring is as case-insensitive as the patterns themselves
+_INST_AC = None
+if ahocorasick is not None:
+    _INST_AC = ahocorasick.Automaton()
+    for _term in ("institute", "university", "college", "school",
+                  "iit", "nit", "bits", "vit", "iim", "iiit"):
+        _INST_AC.add_word(_term, _term)
+    _INST_AC.make_automaton()
+
+_DEGREE_RES = [
+    re.compile(r'(Bachelor\s+of\s+(?:Engineering|Technology|Science|Arts|Commerce)[^\n]*?(?:in[^\n]+?)?)\s*(?:CGPA|GPA|Grade|\d{4}|\n)', re.IGNORECASE),
+    re.compile(r'(Master\s+of\s+(?:Engineering|Technology|Science|Arts|Commerce)[^\n]*?(?:in[^\n]+?)?)\s*(?:CGPA|GPA|Grade|\d{4}|\n)', re.IGNORECASE),
+    re.compile(r'(B\.?E\.?|B\.?Tech\.?|M\.?Tech\.?|B\.?Sc\.?|M\.?Sc\.?|PhD)[^\n]*?(?:in\s+[^\n]+?)?\s*(?:CGPA|GPA|Grade|\d{4}|\n)', re.IGNORECASE),
+]
+
+_CGPA_RES = [
+    re.compile(r'(?:CGPA|GPA|Grade)\s*[:\-]?\s*(\d+\.?\d*)\s*(?:/|out\s+of)?\s*(\d+\.?\d*)?', re.IGNORECASE),
+    re.compile(r'(\d+\.?\d*)\s*/\s*(\d+\.?\d*)\s*(?:CGPA|GPA)', re.IGNORECASE),
+    re.compile(r'(?:Percentage|Marks)\s*[:\-]?\s*(\d+\.?\d*)%?', re.IGNORECASE)
+]
+
+# College/degree/CGPA sit in the top third of a resume; bounding the
+# searches keeps multi-page CVs from being scanned end to end
+_SCAN_WINDOW = 4000
+
+_NER = None
+
+
+def _load_onnx_ner(onnx_dir):
+    """Build the pipeline from a quantized ONNX export of the NER model.
+
+    Export once with:
+        optimum-cli export onnx --model dslim/distilbert-NER \\
+            --task token-classification ner_onnx/
+        optimum-cli onnxruntime quantize --arch bert \\
+            --onnx_model ner_onnx/ -o ner_onnx_int8/
+    then point NER_ONNX_DIR at the int8 directory (~2x CPU throughput).
+    """
+    from optimum.onnxruntime import ORTModelForTokenClassification
+    from transformers import AutoTokenizer, pipeline
+
+    return pipeline(
+        "ner",
+        model=ORTModelForTokenClassification.from_pretrained(onnx_dir),
+        tokenizer=AutoTokenizer.from_pretrained(onnx_dir),
+        aggregation_strategy="simple"
+    )
+
+
+def _get_ner():
+    """Load the NER pipeline once per process (model load costs seconds)"""
+    global _NER
+    if _NER is None:
+        onnx_dir = os.getenv("NER_ONNX_DIR")
+        if onnx_dir:
+            try:
+                _NER = _load_onnx_ner(onnx_dir)
+            except Exception as e:
+                print(f"⚠️ Could not load ONNX model from {onnx_dir}: {e}")
+
+        if _NER is None:
+            import torch
+            # transformers pulls in torch/tokenizers (seconds of import);
+            # defer it so regex-only callers load the module instantly
+            from transformers import pipeline
+
+            # Intra-op threads drive the BERT matmuls; torch's default
+            # rarely matches the container's core budget
+            threads = os.getenv("PARSER_THREADS")
+            if threads:
+                torch.set_num_threads(int(threads))
+                torch.set_num_interop_threads(1)
+
+            _NER = pipeline(
+                "ner",
+                # Distilled model: 6 layers instead of 12, ~2x faster, and
+                # picking a PERSON span from a resume header doesn't need more
+                model="dslim/distilbert-NER",
+                aggregation_strategy="simple",
+                device=0 if torch.cuda.is_available() else -1
+            )
+
+        # The first inference pays tokenizer setup and graph tracing;
+        # spend it on a dummy input instead of the first real resume
+        _NER("John Smith")
+    return _NER
 
 
 def extract_text_from_pdf(file_path):
-    """Extract text from PDF with better formatting preservation"""
-    text = ""
+    """Extract text from a PDF (path or file-like object)"""
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            return "\n".join(
+                page.get_textpage().get_text_range() for page in pdf) + "\n"
+        finally:
+            pdf.close()
+
     with pdfplumber.open(file_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text() or ""
-            text += page_text + "\n"
-    return text
+        parts = [page.extract_text() or "" for page in pdf.pages]
+    return "\n".join(parts) + "\n"
 
 
 def clean_name(name):
@@ -19,25 +173,19 @@ def clean_name(name):
         return None
     
     # Remove special characters and extra spaces
-    name = re.sub(r'[#\*\-\_\|]+', ' ', name)
-    name = re.sub(r'\s+', ' ', name)
-    
+    name = _NAME_SPECIAL_RE.sub(' ', name)
+    name = _WS_RE.sub(' ', name)
+
     # Remove common prefixes/suffixes that might be captured
-    name = re.sub(r'^(Mr\.?|Ms\.?|Mrs\.?|Dr\.?|Prof\.?)\s+', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\s+(Resume|CV|Profile)', '', name, flags=re.IGNORECASE)
-    
+    name = _NAME_PREFIX_RE.sub('', name)
+    name = _NAME_SUFFIX_RE.sub('', name)
+
     # Remove any numbers
-    name = re.sub(r'\d+', '', name)
-    
-    # Remove single characters (artifacts)
-    words = name.split()
-    words = [word for word in words if len(word) > 1]
-    
-    # Capitalize properly
-    name = ' '.join(word.capitalize() for word in words)
-    
-    cleaned = name.strip()
+    name = _NAME_DIGIT_RE.sub('', name)
     
+    # Drop single-character artifacts, then title-case in one C-level pass
+    cleaned = ' '.join(w for w in name.split() if len(w) > 1).title()
+
     # Validate: Should have at least 2 words and reasonable length
     if len(cleaned.split()) >= 2 and 4 <= len(cleaned) <= 50:
         return cleaned
@@ -45,9 +193,59 @@ def clean_name(name):
     return None
 
 
-def extract_details_huggingface(text, sender_number=None):
-    """Extract resume details using NER and regex patterns"""
-    
+def _clean_college(college_text):
+    """Clean a matched college name; None if it fails the length check"""
+    # Strip year ranges / "Education" header, then collapse whitespace
+    college_text = _COLLEGE_CLEAN_RE.sub('', college_text.strip())
+    college_text = _WS_RE.sub(' ', college_text).strip()
+
+    # Only accept if it's a reasonable length
+    if 5 <= len(college_text) <= 150:
+        return college_text
+    return None
+
+
+def _college_from_span(span, endpos=None):
+    """Run the college patterns over a span and clean the first hit"""
+    if endpos is None:
+        endpos = len(span)
+
+    for pattern in _COLLEGE_RES:
+        college_match = pattern.search(span, 0, endpos)
+        if college_match:
+            college = _clean_college(college_match.group(1))
+            if college:
+                return college
+    return None
+
+
+def _extract_college(text):
+    """Extract the college/university from the head of the text"""
+    if _INST_AC is not None:
+        # Anchor on institute keywords (over a lowercased copy — ASCII
+        # offsets are identical); the patterns then only see ~200-char
+        # windows around the hits. Patterns iterate in priority order
+        # across all windows so a loose fallback pattern on an early
+        # anchor never beats a reliable pattern on a later one
+        head = text[:_SCAN_WINDOW]
+        windows = [text[max(0, end_pos - 120):end_pos + 80]
+                   for end_pos, _ in _INST_AC.iter(head.lower())]
+        for pattern in _COLLEGE_RES:
+            for window in windows:
+                college_match = pattern.search(window)
+                if college_match:
+                    college = _clean_college(college_match.group(1))
+                    if college:
+                        return college
+
+    # Full bounded scan when there is no automaton or no anchor window
+    # produced a usable name
+    return _college_from_span(text, _SCAN_WINDOW)
+
+
+def _extract_details_fast(text):
+    """Regex/heuristic extraction pass — everything except the NER model"""
+
     details = {
         "name": None,
         "email": None,
@@ -57,331 +255,186 @@ def extract_details_huggingface(text, sender_number=None):
         "cgpa": None,
     }
     
-    # Extract email (most reliable)
-    email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
-    if email_match:
-        details["email"] = email_match.group()
-    
-    # Extract phone number (10+ digits, may have country code)
-    phone_patterns = [
-        r'\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',  # Various formats
-        r'\b\d{10}\b',  # Simple 10 digit
-        r'\+\d{10,15}\b'  # With country code
-    ]
-    for pattern in phone_patterns:
-        phone_match = re.search(pattern, text)
-        if phone_match:
-            # Clean phone number
-            phone = re.sub(r'[-.\s()]', '', phone_match.group())
-            details["phone"] = phone
+    # Email fast path: find the '@' with str.find and run the pattern on
+    # the ~128 chars around it instead of letting the fused scan below
+    # chew through the whole text for it
+    at = text.find('@')
+    if at != -1:
+        email_match = _EMAIL_RE.search(text, max(0, at - 64), at + 64)
+        if email_match:
+            details["email"] = email_match.group()
+
+    # Extract phone and labelled CGPA (and email, if the fast path came
+    # up empty) in one scan over the text
+    for match in _CONTACT_RE.finditer(text):
+        if match.group('email'):
+            if not details["email"]:
+                details["email"] = match.group('email')
+        elif match.group('phone'):
+            if not details["phone"]:
+                # Clean phone number
+                details["phone"] = _PHONE_CLEAN_RE.sub('', match.group('phone'))
+        elif not details["cgpa"]:
+            if match.group('cgpa_max'):
+                # Format: X.XX / Y.YY
+                details["cgpa"] = f"{match.group('cgpa')} / {match.group('cgpa_max')}"
+            else:
+                details["cgpa"] = match.group('cgpa')
+        if details["email"] and details["phone"] and details["cgpa"]:
             break
-    
-    # Extract name using NER (first occurrence at top of resume)
-    try:
-        ner = pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple")
-        # Process only first 1000 chars for name (usually at top)
-        entities = ner(text[:1000])
-        
-        person_entities = []
-        for ent in entities:
-            if ent['entity_group'] == 'PER' and ent['score'] > 0.75:  # Lower threshold
-                person_entities.append({
-                    'word': ent['word'],
-                    'start': ent['start'],
-                    'end': ent['end'],
-                    'score': ent['score']
-                })
-        
-        if person_entities:
-            # Sort by position (earliest first)
-            person_entities.sort(key=lambda x: x['start'])
-            
-            # Try to combine consecutive person entities (likely parts of same name)
-            combined_names = []
-            current_name = person_entities[0]['word']
-            last_end = person_entities[0]['end']
-            
-            for i in range(1, len(person_entities)):
-                # If entities are close together (within 2 chars), combine WITHOUT space
-                # If within 5 chars, combine WITH space
-                gap = person_entities[i]['start'] - last_end
-                
-                if gap <= 2:
-                    # Direct continuation (e.g., "Su" + "jan" -> "Sujan")
-                    current_name += person_entities[i]['word']
-                elif gap <= 5:
-                    # Separate word (e.g., "Sujan" + "Kumar")
-                    current_name += " " + person_entities[i]['word']
-                else:
-                    # Too far apart, start new name
-                    combined_names.append(current_name)
-                    current_name = person_entities[i]['word']
-                
-                last_end = person_entities[i]['end']
-            
-            combined_names.append(current_name)
-            
-            # Take the first (and usually longest) name
-            if combined_names:
-                raw_name = max(combined_names, key=len)  # Pick longest one
-                details["name"] = clean_name(raw_name)
-                
-    except Exception as e:
-        print(f"⚠️ NER extraction error: {e}")
-    
-    # Fallback 1: If name is too short or not found, try regex patterns
-    if not details["name"] or len(details["name"]) < 4:
-        # Try to find name in first few lines (before email/phone)
-        lines = text.split('\n')[:5]  # Check first 5 lines
-        
-        for line in lines:
-            line = line.strip()
-            # Skip lines with common keywords
-            if any(keyword in line.lower() for keyword in ['resume', 'cv', 'curriculum', 'profile', 'contact', 'email', 'phone', 'education', 'experience']):
-                continue
-            
-            # Check if line looks like a name (2-4 words, proper case, no numbers)
-            words = line.split()
-            if 2 <= len(words) <= 4 and not any(char.isdigit() for char in line):
-                # Check if words start with capital letters
-                if all(word[0].isupper() for word in words if len(word) > 1):
-                    details["name"] = clean_name(line)
-                    break
-    
-    # Fallback 2: Extract from text using name pattern
-    if not details["name"] or len(details["name"]) < 4:
-        name_pattern = r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})'
-        name_match = re.search(name_pattern, text, re.MULTILINE)
-        if name_match:
-            details["name"] = clean_name(name_match.group(1))
-    
-    # Extract College/University (improved patterns)
-    college_patterns = [
-        # Pattern 1: Capture full name before year (most reliable)
-        r'([A-Z][A-Za-z\s&,.-]+?(?:Institute|University|College|School)[A-Za-z\s&,.-]*?)\s*\d{4}',
-        # Pattern 2: Capture institute with "of" prefix
-        r'([A-Z][^\n]*?\s+(?:Institute|University|College|School)\s+of\s+[^\n]+?)(?:\d{4}|\n)',
-        # Pattern 3: Famous institutes with abbreviations
-        r'((?:IIT|NIT|BITS|VIT|MIT|IIM|IIIT)[^\n]+?)(?:\d{4}|\n)',
-        # Pattern 4: Generic institute names
-        r'([A-Z][^\n]{10,80}?(?:Institute|University|College|School)[^\n]{0,40}?)(?:\d{4}|\n)',
-    ]
-    
-    for pattern in college_patterns:
-        college_match = re.search(pattern, text, re.IGNORECASE)
-        if college_match:
-            college_text = college_match.group(1).strip()
-            # Clean up the text
-            college_text = re.sub(r'\s+', ' ', college_text)  # Remove extra spaces
-            college_text = re.sub(r'\d{4}\s*[-–]\s*\d{4}', '', college_text)  # Remove year ranges
-            college_text = re.sub(r'\d{4}\s*[-–]\s*Present', '', college_text)  # Remove "2022-Present"
-            college_text = re.sub(r'Education\s*', '', college_text, flags=re.IGNORECASE)  # Remove "Education" prefix
-            college_text = college_text.strip()
-            
-            # Only accept if it's a reasonable length
-            if 10 <= len(college_text) <= 150:
-                details["college"] = college_text
+
+
+    # Extract name with the cheap line heuristic (the name is the first
+    # non-keyword line on most resumes); the callers fall back to NER only
+    # when this comes up empty
+    lines = text.split('\n', 6)[:5]  # Check first 5 lines
+
+    for line in lines:
+        line = line.strip()
+        # Skip lines with common keywords
+        if _NAME_SKIP_RE.search(line):
+            continue
+
+        # Check if line looks like a name (2-4 words, proper case, no numbers)
+        words = line.split()
+        if 2 <= len(words) <= 4 and not any(char.isdigit() for char in line):
+            # Check if words start with capital letters
+            if all(word[0].isupper() for word in words if len(word) > 1):
+                details["name"] = clean_name(line)
                 break
+
     
+    # Extract College/University (improved patterns)
+    details["college"] = _extract_college(text)
+
+
     # Extract Degree (improved patterns)
-    degree_patterns = [
-        r'(Bachelor\s+of\s+(?:Engineering|Technology|Science|Arts|Commerce)[^\n]*?(?:in[^\n]+?)?)\s*(?:CGPA|GPA|Grade|\d{4}|\n)',
-        r'(Master\s+of\s+(?:Engineering|Technology|Science|Arts|Commerce)[^\n]*?(?:in[^\n]+?)?)\s*(?:CGPA|GPA|Grade|\d{4}|\n)',
-        r'(B\.?E\.?|B\.?Tech\.?|M\.?Tech\.?|B\.?Sc\.?|M\.?Sc\.?|PhD)[^\n]*?(?:in\s+[^\n]+?)?\s*(?:CGPA|GPA|Grade|\d{4}|\n)',
-    ]
-    
-    for pattern in degree_patterns:
-        degree_match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _DEGREE_RES:
+        degree_match = pattern.search(text, 0, _SCAN_WINDOW)
         if degree_match:
             degree_text = degree_match.group(1).strip()
             # Clean up the degree text
-            degree_text = re.sub(r'\s+', ' ', degree_text)
+            degree_text = _WS_RE.sub(' ', degree_text)
             details["degree"] = degree_text
             break
-    
-    # Extract CGPA/GPA (multiple patterns)
-    cgpa_patterns = [
-        r'(?:CGPA|GPA|Grade)\s*[:\-]?\s*(\d+\.?\d*)\s*(?:/|out\s+of)?\s*(\d+\.?\d*)?',
-        r'(\d+\.?\d*)\s*/\s*(\d+\.?\d*)\s*(?:CGPA|GPA)',
-        r'(?:Percentage|Marks)\s*[:\-]?\s*(\d+\.?\d*)%?'
-    ]
-    
-    for pattern in cgpa_patterns:
-        cgpa_match = re.search(pattern, text, re.IGNORECASE)
-        if cgpa_match:
-            if len(cgpa_match.groups()) >= 2 and cgpa_match.group(2):
-                # Format: X.XX / Y.YY
-                details["cgpa"] = f"{cgpa_match.group(1)} / {cgpa_match.group(2)}"
-            else:
-                details["cgpa"] = cgpa_match.group(1)
-            break
-    
+
+    # CGPA fallback for formats the fused scan misses ("8.9 / 10 CGPA",
+    # "Percentage: 87")
+    if not details["cgpa"]:
+        for pattern in _CGPA_RES:
+            cgpa_match = pattern.search(text, 0, _SCAN_WINDOW)
+            if cgpa_match:
+                if len(cgpa_match.groups()) >= 2 and cgpa_match.group(2):
+                    # Format: X.XX / Y.YY
+                    details["cgpa"] = f"{cgpa_match.group(1)} / {cgpa_match.group(2)}"
+                else:
+                    details["cgpa"] = cgpa_match.group(1)
+                break
+
     return details
-    
+
+
+def _name_from_entities(entities):
+    """Combine NER person entities into the most likely candidate name"""
+    person_entities = []
+    for ent in entities:
+        if ent['entity_group'] == 'PER' and ent['score'] > 0.75:  # Lower threshold
+            person_entities.append({
+                'word': ent['word'],
+                'start': ent['start'],
+                'end': ent['end'],
+                'score': ent['score']
+            })
+
+    if not person_entities:
+        return None
+
+    # Sort by position (earliest first)
+    person_entities.sort(key=lambda x: x['start'])
+
+    # Combine consecutive entities (likely parts of the same name) as
+    # segment lists joined once, instead of growing a string per entity
+    combined_names = []
+    segments = [person_entities[0]['word']]
+    last_end = person_entities[0]['end']
+
+    for ent in person_entities[1:]:
+        # If entities are close together (within 5 chars), combine them
+        if ent['start'] - last_end <= 5:
+            segments.append(' ' + ent['word'])
+        else:
+            combined_names.append(''.join(segments))
+            segments = [ent['word']]
+        last_end = ent['end']
+
+    combined_names.append(''.join(segments))
+
+    raw_name = max(combined_names, key=len)  # Pick longest one
+    return clean_name(raw_name)
+
+
+def _ner_snippet(ner, text):
+    """Clamp NER input to 64 tokens — the name sits in the header, and
+    BERT attention cost grows quadratically with sequence length"""
+    tok = ner.tokenizer
+    ids = tok(text[:1000], truncation=True, max_length=64)['input_ids']
+    return tok.decode(ids, skip_special_tokens=True)
+
 
 def extract_details_huggingface(text, sender_number=None):
     """Extract resume details using NER and regex patterns"""
-    
-    details = {
-        "name": None,
-        "email": None,
-        "phone": None,
-        "college": None,
-        "degree": None,
-        "cgpa": None,
-    }
-    
-    # Extract email (most reliable)
-    email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
-    if email_match:
-        details["email"] = email_match.group()
-    
-    # Extract phone number (10+ digits, may have country code)
-    phone_patterns = [
-        r'\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',  # Various formats
-        r'\b\d{10}\b',  # Simple 10 digit
-        r'\+\d{10,15}\b'  # With country code
-    ]
-    for pattern in phone_patterns:
-        phone_match = re.search(pattern, text)
-        if phone_match:
-            # Clean phone number
-            phone = re.sub(r'[-.\s()]', '', phone_match.group())
-            details["phone"] = phone
-            break
-    
-    # Extract name using NER (first occurrence at top of resume)
-    try:
-        ner = pipeline("ner", model="dslim/bert-base-NER", aggregation_strategy="simple")
-        # Process only first 1000 chars for name (usually at top)
-        entities = ner(text[:1000])
-        
-        person_entities = []
-        for ent in entities:
-            if ent['entity_group'] == 'PER' and ent['score'] > 0.75:  # Lower threshold
-                person_entities.append({
-                    'word': ent['word'],
-                    'start': ent['start'],
-                    'end': ent['end'],
-                    'score': ent['score']
-                })
-        
-        if person_entities:
-            # Sort by position (earliest first)
-            person_entities.sort(key=lambda x: x['start'])
-            
-            # Try to combine consecutive person entities (likely parts of same name)
-            combined_names = []
-            current_name = person_entities[0]['word']
-            last_end = person_entities[0]['end']
-            
-            for i in range(1, len(person_entities)):
-                # If entities are close together (within 5 chars), combine them
-                if person_entities[i]['start'] - last_end <= 5:
-                    current_name += " " + person_entities[i]['word']
-                    last_end = person_entities[i]['end']
-                else:
-                    combined_names.append(current_name)
-                    current_name = person_entities[i]['word']
-                    last_end = person_entities[i]['end']
-            
-            combined_names.append(current_name)
-            
-            # Take the first (and usually longest) name
-            if combined_names:
-                raw_name = max(combined_names, key=len)  # Pick longest one
-                details["name"] = clean_name(raw_name)
-                
-    except Exception as e:
-        print(f"⚠️ NER extraction error: {e}")
-    
-    # Fallback 1: If name is too short or not found, try regex patterns
+    details = _extract_details_fast(text)
+
+    # Fallback 1: NER on the resume header (name is usually at the top)
     if not details["name"] or len(details["name"]) < 4:
-        # Try to find name in first few lines (before email/phone)
-        lines = text.split('\n')[:5]  # Check first 5 lines
-        
-        for line in lines:
-            line = line.strip()
-            # Skip lines with common keywords
-            if any(keyword in line.lower() for keyword in ['resume', 'cv', 'curriculum', 'profile', 'contact', 'email', 'phone', 'education', 'experience']):
-                continue
-            
-            # Check if line looks like a name (2-4 words, proper case, no numbers)
-            words = line.split()
-            if 2 <= len(words) <= 4 and not any(char.isdigit() for char in line):
-                # Check if words start with capital letters
-                if all(word[0].isupper() for word in words if len(word) > 1):
-                    details["name"] = clean_name(line)
-                    break
-    
+        try:
+            ner = _get_ner()
+            entities = ner(_ner_snippet(ner, text))
+            name = _name_from_entities(entities)
+            if name:
+                details["name"] = name
+        except Exception as e:
+            print(f"⚠️ NER extraction error: {e}")
+
     # Fallback 2: Extract from text using name pattern
     if not details["name"] or len(details["name"]) < 4:
-        name_pattern = r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})'
-        name_match = re.search(name_pattern, text, re.MULTILINE)
+        name_match = _NAME_LINE_RE.search(text, 0, _SCAN_WINDOW)
         if name_match:
             details["name"] = clean_name(name_match.group(1))
-    
-    # Extract College/University (improved patterns)
-    college_patterns = [
-        # Pattern 1: Capture full name before year (most reliable)
-        r'([A-Z][A-Za-z\s&,.-]+?(?:Institute|University|College|School)[A-Za-z\s&,.-]*?)\s*\d{4}',
-        # Pattern 2: Capture institute with "of" prefix
-        r'([A-Z][^\n]*?\s+(?:Institute|University|College|School)\s+of\s+[^\n]+?)(?:\d{4}|\n)',
-        # Pattern 3: Famous institutes with abbreviations
-        r'((?:IIT|NIT|BITS|VIT|MIT|IIM|IIIT)[^\n]+?)(?:\d{4}|\n)',
-        # Pattern 4: Generic institute names
-        r'([A-Z][^\n]{10,80}?(?:Institute|University|College|School)[^\n]{0,40}?)(?:\d{4}|\n)',
-        # Pattern 5: Fallback        
-        r'\b(IIT|NIT|BITS|VIT|MIT|IIM|IIIT)\s+[A-Z][a-zA-Z]*'
-    ]
-    
-    for pattern in college_patterns:
-        college_match = re.search(pattern, text, re.IGNORECASE)
-        if college_match:
-            college_text = college_match.group(1).strip()
-            # Clean up the text
-            college_text = re.sub(r'\s+', ' ', college_text)  # Remove extra spaces
-            college_text = re.sub(r'\d{4}\s*[-–]\s*\d{4}', '', college_text)  # Remove year ranges
-            college_text = re.sub(r'\d{4}\s*[-–]\s*Present', '', college_text)  # Remove "2022-Present"
-            college_text = re.sub(r'Education\s*', '', college_text, flags=re.IGNORECASE)  # Remove "Education" prefix
-            college_text = college_text.strip()
-            
-            # Only accept if it's a reasonable length
-            if 5 <= len(college_text) <= 150:
-                details["college"] = college_text
-                break
-    
-    # Extract Degree (improved patterns)
-    degree_patterns = [
-        r'(Bachelor\s+of\s+(?:Engineering|Technology|Science|Arts|Commerce)[^\n]*?(?:in[^\n]+?)?)\s*(?:CGPA|GPA|Grade|\d{4}|\n)',
-        r'(Master\s+of\s+(?:Engineering|Technology|Science|Arts|Commerce)[^\n]*?(?:in[^\n]+?)?)\s*(?:CGPA|GPA|Grade|\d{4}|\n)',
-        r'(B\.?E\.?|B\.?Tech\.?|M\.?Tech\.?|B\.?Sc\.?|M\.?Sc\.?|PhD)[^\n]*?(?:in\s+[^\n]+?)?\s*(?:CGPA|GPA|Grade|\d{4}|\n)',
-    ]
-    
-    for pattern in degree_patterns:
-        degree_match = re.search(pattern, text, re.IGNORECASE)
-        if degree_match:
-            degree_text = degree_match.group(1).strip()
-            # Clean up the degree text
-            degree_text = re.sub(r'\s+', ' ', degree_text)
-            details["degree"] = degree_text
-            break
-    
-    # Extract CGPA/GPA (multiple patterns)
-    cgpa_patterns = [
-        r'(?:CGPA|GPA|Grade)\s*[:\-]?\s*(\d+\.?\d*)\s*(?:/|out\s+of)?\s*(\d+\.?\d*)?',
-        r'(\d+\.?\d*)\s*/\s*(\d+\.?\d*)\s*(?:CGPA|GPA)',
-        r'(?:Percentage|Marks)\s*[:\-]?\s*(\d+\.?\d*)%?'
-    ]
-    
-    for pattern in cgpa_patterns:
-        cgpa_match = re.search(pattern, text, re.IGNORECASE)
-        if cgpa_match:
-            if len(cgpa_match.groups()) >= 2 and cgpa_match.group(2):
-                # Format: X.XX / Y.YY
-                details["cgpa"] = f"{cgpa_match.group(1)} / {cgpa_match.group(2)}"
-            else:
-                details["cgpa"] = cgpa_match.group(1)
-            break
-    
-    return details
\ No newline at end of file
+
+    return details
+
+
+def extract_details_batch(texts, sender_numbers=None):
+    """Extract details for many resumes, batching the NER forward passes"""
+    results = [_extract_details_fast(text) for text in texts]
+
+    # One batched forward pass covers every resume the heuristic missed
+    pending = [i for i, d in enumerate(results)
+               if not d["name"] or len(d["name"]) < 4]
+    if pending:
+        try:
+            ner = _get_ner()
+            snippets = [_ner_snippet(ner, texts[i]) for i in pending]
+            entity_lists = ner(snippets, batch_size=16)
+            for i, entities in zip(pending, entity_lists):
+                name = _name_from_entities(entities)
+                if name:
+                    results[i]["name"] = name
+        except Exception as e:
+            print(f"⚠️ NER extraction error: {e}")
+
+    for i, details in enumerate(results):
+        if not details["name"] or len(details["name"]) < 4:
+            name_match = _NAME_LINE_RE.search(texts[i], 0, _SCAN_WINDOW)
+            if name_match:
+                details["name"] = clean_name(name_match.group(1))
+
+    return results
+
+
+# Pre-load the NER model at startup (set WARM_START=1) so the first real
+# request doesn't pay the multi-second model load; the regexes above are
+# already compiled by the import itself
+if os.getenv("WARM_START"):
+    _get_ner()
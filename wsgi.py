@@ -0,0 +1,6 @@
+"""WSGI entry point for production servers.
+
+Run with: gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5000 wsgi:app
+"""
+
+from app import app  # noqa: F401